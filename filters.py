@@ -0,0 +1,349 @@
+"""
+Shared tender filtering for the Oman Tender Board scripts.
+Matches tenders against the monitored keywords and entities and groups the matches by entity.
+"""
+
+import json
+import re
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import ahocorasick
+except ImportError:
+    # pyahocorasick is optional; without it we fall back to plain substring scans
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it the tender file is parsed in one go
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; without it the stdlib json module is used
+    orjson = None
+
+
+class NeedleMatcher:
+    """Finds which of a fixed set of lowercased needles occur in a lowercased text"""
+    
+    def __init__(self, needles):
+        self.needles = tuple(needles)
+        
+        # A single alternation regex rejects non-matching texts in one C-level scan
+        self.pattern = re.compile("|".join(re.escape(needle) for needle in self.needles))
+        
+        # With pyahocorasick, one automaton pass also collects every hit
+        self.automaton = None
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for index, needle in enumerate(self.needles):
+                self.automaton.add_word(needle, (index, needle))
+            self.automaton.make_automaton()
+    
+    def find(self, text):
+        """Return the needles occurring in text, in needle-list order"""
+        if self.automaton is None and not self.pattern.search(text):
+            return []
+        return self._collect(text)
+    
+    def _collect(self, text):
+        """Return the needles occurring in text, without the regex pre-check"""
+        if self.automaton is not None:
+            hits = {value for _, value in self.automaton.iter(text)}
+            return [needle for _, needle in sorted(hits)]
+        # The alternation only reports one needle per position, so collect overlaps explicitly
+        return [needle for needle in self.needles if needle in text]
+    
+    def matching_rows(self, texts):
+        """Return the indices of the texts containing any needle, scanning the whole column at once"""
+        column, row_starts = _join_column(texts)
+        rows = set()
+        match = self.pattern.search(column)
+        while match:
+            row = bisect_right(row_starts, match.start()) - 1
+            rows.add(row)
+            if row + 1 == len(row_starts):
+                break
+            # One hit is enough to keep a row, so resume at the start of the next one
+            match = self.pattern.search(column, row_starts[row + 1])
+        return rows
+    
+    def find_rows(self, texts):
+        """Map the index of each text containing a needle to the needles it contains, in needle-list order"""
+        if self.automaton is None:
+            # The row scan already proved a hit in each of these rows, so skip find's pre-check
+            return {row: self._collect(texts[row]) for row in self.matching_rows(texts)}
+        
+        # A single automaton pass over the whole column collects the hits for every row
+        column, row_starts = _join_column(texts)
+        hits = defaultdict(set)
+        for end, value in self.automaton.iter(column):
+            hits[bisect_right(row_starts, end) - 1].add(value)
+        return {row: [needle for _, needle in sorted(values)] for row, values in hits.items()}
+
+
+def _join_column(texts):
+    """Join texts into one newline-separated string, returning it with the offset each text starts at"""
+    # No needle contains a newline, so a hit can never straddle two rows
+    column = "\n".join(texts)
+    row_starts = []
+    offset = 0
+    for text in texts:
+        row_starts.append(offset)
+        offset += len(text) + 1
+    return column, row_starts
+
+
+# Scraped JSON field names and the Tender attributes holding them, in output order
+_SCRAPED_FIELDS = {
+    "S.No.": "serial_no",
+    "Tender No": "tender_no",
+    "Tender Title": "title",
+    "Entity": "entity",
+    "Category": "category",
+    "Tender Type": "tender_type",
+    "Date": "date",
+    "Tender Fee": "tender_fee",
+    "Tender Bond": "tender_bond",
+}
+
+# Fields added by the filter, written after any scraped fields
+_ADDED_FIELDS = {
+    "Match_Reason": "match_reason",
+    "Scraped_At": "scraped_at",
+}
+
+_ROW_FIELDS = {**_SCRAPED_FIELDS, **_ADDED_FIELDS}
+
+
+@dataclass(slots=True)
+class Tender:
+    """A tender record, held in slots rather than a per-row dict"""
+    serial_no: str | None = None
+    tender_no: str | None = None
+    title: str | None = None
+    entity: str | None = None
+    category: str | None = None
+    tender_type: str | None = None
+    date: str | None = None
+    tender_fee: str | None = None
+    tender_bond: str | None = None
+    match_reason: str | None = None
+    scraped_at: str | None = None
+    # Scraped fields without a slot of their own, so new columns still reach the output
+    extra: dict | None = None
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build a tender from a scraped JSON row, keeping unknown fields in extra"""
+        fields = {}
+        extra = {}
+        for key, value in row.items():
+            if key in _ROW_FIELDS:
+                fields[_ROW_FIELDS[key]] = value
+            else:
+                extra[key] = value
+        return cls(**fields, extra=extra or None)
+    
+    def as_row(self, entity=True):
+        """Return the tender as a JSON row with the scraped field names, skipping unset fields"""
+        row = {}
+        for key, name in _SCRAPED_FIELDS.items():
+            value = getattr(self, name)
+            if value is not None and (entity or name != "entity"):
+                row[key] = value
+        if self.extra:
+            row.update(self.extra)
+        for key, name in _ADDED_FIELDS.items():
+            value = getattr(self, name)
+            if value is not None:
+                row[key] = value
+        return row
+
+
+def iter_tenders(f):
+    """Yield Tenders from an open JSON array file, streaming them when ijson is available"""
+    if ijson is not None:
+        rows = ijson.items(f, "item", use_float=True)
+    elif orjson is not None:
+        rows = orjson.loads(f.read())
+    else:
+        rows = json.load(f)
+    return map(Tender.from_row, rows)
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _tender_row(tender):
+    """Serialize a Tender as its full JSON row"""
+    if isinstance(tender, Tender):
+        return tender.as_row()
+    raise TypeError(f"Object of type {type(tender).__name__} is not JSON serializable")
+
+
+def dump_json(data, filename):
+    """Write data to filename as indented JSON, using orjson when available"""
+    if orjson is None:
+        # Write raw UTF-8 like orjson does, so both paths produce the same bytes
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=_tender_row)
+        return
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(data, default=_tender_row,
+                             option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS))
+
+
+def dump_grouped(organized_tenders, filename):
+    """Write tenders organized by entity, leaving the Entity field the key already names out of each row"""
+    dump_json({
+        entity: [tender.as_row(entity=False) for tender in entity_tenders]
+        for entity, entity_tenders in organized_tenders.items()
+    }, filename)
+
+
+# Comprehensive keywords to filter by
+KEYWORDS = [
+    "ai infrastructure", "cloud", "vmware", "infrastructure as a service", 
+    "digital transformation", "scaling", "migration", "gpu", "llm", "oracle", 
+    "chatbot", "ai", "machine learning", "artificial intelligence", 
+    "cloud computing", "data center", "virtualization", "devops", 
+    "microservices", "database", "analytics", "big data"
+]
+
+# Organizations/Entities being monitored
+MONITORED_ENTITIES = [
+    # Banks & Financial Institutions
+    "bank muscat", "bank dhofar", "sohar international bank", "bank nizwa", 
+    "al izz islamic bank", "oman housing bank", "national bank of oman", 
+    "al ahli bank", "central bank of oman", "oman arab bank", 
+    "oman development bank", "muscat clearing depository", "dhofar insurance",
+    
+    # Telecommunications
+    "omantel", "vodafone", "ooredoo", "oman broadband company", 
+    "telecommunication regulatory authority",
+    
+    # Oil & Gas
+    "petroleum development oman", "oq", "british petroleum", "mb petroleum", 
+    "oman oil marketing", "daleel", "minerals development oman",
+    
+    # Government Ministries
+    "ministry of finance", "ministry of health", "ministry of defense", 
+    "ministry of technology and communications", "ministry of oil", 
+    "ministry of interior", "ministry",
+    
+    # Defense & Security
+    "royal oman police", "royal air force of oman", "royal navy of oman", 
+    "sultan special forces", "internal security service",
+    
+    # Healthcare
+    "royal hospital", "sultan qaboos university hospital", 
+    "armed forces hospital", "hospital",
+    
+    # Education
+    "sultan qaboos university", "university of applied sciences", 
+    "dhofar university", "university"
+]
+
+BATCH_SIZE = 1000
+
+# Lowercase the needles once rather than on every comparison
+_keywords_lc = tuple(keyword.lower() for keyword in KEYWORDS)
+_entities_lc = tuple(entity.lower() for entity in MONITORED_ENTITIES)
+
+# The catch-all entities match every specific name containing them, so only the
+# catch-alls and the names they don't cover are needed to decide a match; the
+# specific names are kept to give a more precise Match_Reason
+_entity_broad = ("ministry", "hospital", "university")
+_entity_specific = tuple(entity for entity in _entities_lc if entity not in _entity_broad)
+_entity_needles = _entity_broad + tuple(
+    entity for entity in _entity_specific
+    if not any(token in entity for token in _entity_broad)
+)
+
+# Built once at import so every caller in the process shares the same matchers
+_keyword_matcher = NeedleMatcher(_keywords_lc)
+_entity_matcher = NeedleMatcher(_entity_needles)
+_entity_specific_matcher = NeedleMatcher(_entity_specific)
+
+
+@lru_cache(maxsize=4096)
+def _entity_reason(entity):
+    """Return the Match_Reason entry for a monitored entity name"""
+    # Report the specific names that matched, falling back to the catch-alls
+    entity = entity.lower()
+    matching_entities = (_entity_specific_matcher.find(entity)
+                         or [token for token in _entity_broad if token in entity])
+    return f"Entity: {', '.join(matching_entities)}"
+
+
+def filter_tenders(tenders):
+    """Return the tenders in a batch matching a keyword or monitored entity, with a Match_Reason"""
+    filtered_tenders = []
+    
+    # Lowercase the title column once and collect the keyword hits for every row in one pass
+    titles = [tender.title.lower() for tender in tenders]
+    keyword_hits = _keyword_matcher.find_rows(titles)
+    
+    # Entity names repeat heavily across tenders, so each distinct name is matched only once
+    entity_names = [tender.entity for tender in tenders]
+    distinct_entities = list(dict.fromkeys(entity_names))
+    monitored = {
+        distinct_entities[row]
+        for row in _entity_matcher.matching_rows([entity.lower() for entity in distinct_entities])
+    }
+    entity_rows = {index for index, entity in enumerate(entity_names) if entity in monitored}
+    
+    for index in sorted(keyword_hits.keys() | entity_rows):
+        tender = tenders[index]
+        
+        # Only collect matches on the side(s) the column scan already found a hit on
+        match_reasons = []
+        if index in keyword_hits:
+            match_reasons.append(f"Keywords: {', '.join(keyword_hits[index])}")
+        if index in entity_rows:
+            match_reasons.append(_entity_reason(entity_names[index]))
+        
+        tender.match_reason = "; ".join(match_reasons)
+        filtered_tenders.append(tender)
+    
+    return filtered_tenders
+
+
+def organize_by_entity(tenders):
+    """Organize tenders by entity"""
+    organized_tenders = defaultdict(list)
+    for tender in tenders:
+        # Tenders from the same entity share one interned string, which also backs the group key.
+        # The key already names the entity, so dump_grouped leaves it out of each grouped tender
+        entity = tender.entity = sys.intern(tender.entity)
+        organized_tenders[entity].append(tender)
+    return dict(organized_tenders)
+
+
+def filter_and_organize(tenders, batch_size=BATCH_SIZE, filter_batch=filter_tenders):
+    """
+    Filter a stream of tenders a batch at a time and organize the matches by entity.
+    Returns the number of tenders read, the matching tenders and the matches by entity.
+    """
+    filtered_tenders = []
+    tender_count = 0
+    for batch in batched(tenders, batch_size):
+        tender_count += len(batch)
+        filtered_tenders.extend(filter_batch(batch))
+    return tender_count, filtered_tenders, organize_by_entity(filtered_tenders)